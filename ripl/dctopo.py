@@ -11,6 +11,8 @@ standard Mininet Topo object with layer metadata plus convenience functions to
 enumerate up, down, and layer edges.
 '''
 
+from collections import defaultdict
+
 from mininet.topo import Topo
 
 
@@ -20,6 +22,8 @@ PORT_BASE = 1  # starting index for OpenFlow switch ports
 class NodeID(object):
     '''Topo node identifier.'''
 
+    __slots__ = ('dpid',)
+
     def __init__(self, dpid = None):
         '''Init.
 
@@ -56,6 +60,9 @@ class NodeID(object):
 class StructuredNodeSpec(object):
     '''Layer-specific vertex metadata for a StructuredTopo graph.'''
 
+    __slots__ = ('up_total', 'down_total', 'up_speed', 'down_speed',
+                 'type_str')
+
     def __init__(self, up_total, down_total, up_speed, down_speed,
                  type_str = None):
         '''Init.
@@ -76,6 +83,8 @@ class StructuredNodeSpec(object):
 class StructuredEdgeSpec(object):
     '''Static edge metadata for a StructuredTopo graph.'''
 
+    __slots__ = ('speed',)
+
     def __init__(self, speed = 1.0):
         '''Init.
 
@@ -97,6 +106,86 @@ class StructuredTopo(Topo):
         super(StructuredTopo, self).__init__()
         self.node_specs = node_specs
         self.edge_specs = edge_specs
+        self._layer_of = {}  # node name -> layer, filled in by addNode
+        self._nodes_by_layer = defaultdict(set)  # layer -> node names
+        self._up_cache = {}  # node name -> up_nodes result
+        self._down_cache = {}  # node name -> down_nodes result
+        self._adj = {}  # node name -> {neighbor name: link opts}
+        self._n_nodes = None  # cached counts; None until next query
+        self._n_edges = None
+
+    def addNode(self, name, **opts):
+        '''Add node, recording its layer for fast lookup.
+
+        @param name name of node
+        @param opts node options, normally from def_nopts
+        @return name name of node
+        '''
+        # FatTreeTopo adds some switches more than once; bucket them once.
+        if 'layer' in opts and name not in self._layer_of:
+            layer = opts['layer']
+            self._layer_of[name] = layer
+            self._nodes_by_layer[layer].add(name)
+        self._n_nodes = None
+        return super(StructuredTopo, self).addNode(name, **opts)
+
+    def addLink(self, node1, node2, *args, **opts):
+        '''Add link, tracking adjacency and dropping cached neighbors.
+
+        @param node1 name of first node
+        @param node2 name of second node
+        @return result whatever Topo.addLink returns
+        '''
+        adj = self._adj
+        adj.setdefault(node1, {})[node2] = opts
+        adj.setdefault(node2, {})[node1] = opts
+        for cache in (self._up_cache, self._down_cache):
+            cache.pop(node1, None)
+            cache.pop(node2, None)
+        self._n_edges = None
+        return super(StructuredTopo, self).addLink(node1, node2, *args,
+                                                   **opts)
+
+    def _bulk_add_edges(self, edges, **opts):
+        '''Add many links, updating StructuredTopo state once per batch.
+
+        Calls Topo.addLink directly for every edge, so Mininet's port and
+        link bookkeeping is done, but any subclass override of addLink is
+        bypassed.
+
+        @param edges iterable of (node1, node2) name pairs
+        @param opts link options applied to every edge
+        '''
+        adj = self._adj
+        add_link = super(StructuredTopo, self).addLink
+        for node1, node2 in edges:
+            link_opts = dict(opts)
+            adj.setdefault(node1, {})[node2] = link_opts
+            adj.setdefault(node2, {})[node1] = link_opts
+            add_link(node1, node2, **opts)
+        self._up_cache.clear()
+        self._down_cache.clear()
+        self._n_edges = None
+
+    def number_of_nodes(self):
+        '''Return number of nodes, cached until the topo next changes.
+
+        @return count number of nodes
+        '''
+        if self._n_nodes is None:
+            self._n_nodes = len(self.g.nodes())
+        return self._n_nodes
+
+    def number_of_edges(self):
+        '''Return number of links, cached until the topo next changes.
+
+        Counted from Topo.links(), so parallel links count individually.
+
+        @return count number of links
+        '''
+        if self._n_edges is None:
+            self._n_edges = len(self.links(sort = False))
+        return self._n_edges
 
     def def_nopts(self, layer):
         '''Return default dict for a structured topo.
@@ -112,7 +201,7 @@ class StructuredTopo(Topo):
         @param name name of switch
         @return layer layer of switch
         '''
-        return self.node_info[name]['layer']
+        return self._layer_of[name]
 
     def isPortUp(self, port):
         ''' Returns whether port is facing up or down
@@ -128,12 +217,7 @@ class StructuredTopo(Topo):
         @param layer layer
         @return names list of names
         '''
-        def is_layer(n):
-            '''Returns true if node is at layer.'''
-            return self.layer(n) == layer
-
-        nodes = [n for n in self.g.nodes() if is_layer(n)]
-        return nodes
+        return list(self._nodes_by_layer.get(layer, ()))
 
     def up_nodes(self, name):
         '''Return edges one layer higher (closer to core).
@@ -142,9 +226,13 @@ class StructuredTopo(Topo):
 
         @return names list of names
         '''
-        layer = self.layer(name) - 1
-        nodes = [n for n in self.g[name] if self.layer(n) == layer]
-        return nodes
+        nodes = self._up_cache.get(name)
+        if nodes is None:
+            layer = self._layer_of[name] - 1
+            wanted = self._nodes_by_layer.get(layer, frozenset())
+            nodes = tuple(wanted.intersection(self._adj.get(name, ())))
+            self._up_cache[name] = nodes
+        return list(nodes)
 
     def down_nodes(self, name):
         '''Return edges one layer higher (closer to hosts).
@@ -152,9 +240,13 @@ class StructuredTopo(Topo):
         @param name name
         @return names list of names
         '''
-        layer = self.layer(name) + 1
-        nodes = [n for n in self.g[name] if self.layer(n) == layer]
-        return nodes
+        nodes = self._down_cache.get(name)
+        if nodes is None:
+            layer = self._layer_of[name] + 1
+            wanted = self._nodes_by_layer.get(layer, frozenset())
+            nodes = tuple(wanted.intersection(self._adj.get(name, ())))
+            self._down_cache[name] = nodes
+        return list(nodes)
 
     def up_edges(self, name):
         '''Return edges one layer higher (closer to core).
@@ -232,6 +324,8 @@ class FatTreeTopo(StructuredTopo):
     class FatTreeNodeID(NodeID):
         '''Fat Tree-specific node.'''
 
+        __slots__ = ('pod', 'sw', 'host')
+
         def __init__(self, pod = 0, sw = 0, host = 0, dpid = None, name = None):
             '''Create FatTreeNodeID object from custom params.
 
@@ -294,15 +388,14 @@ class FatTreeTopo(StructuredTopo):
         @param name name of node
         @return d dict with layer key/val pair, plus anything else (later)
         '''
-        d = {'layer': layer}
-        if name:
-            id = self.id_gen(name = name)
-            # For hosts only, set the IP
-            if layer == self.LAYER_HOST:
-              d.update({'ip': id.ip_str()})
-              d.update({'mac': id.mac_str()})
-            d.update({'dpid': "%016x" % id.dpid})
-        return d
+        if not name:
+            return {'layer': layer}
+        id = self.id_gen(name = name)
+        # For hosts only, set the IP
+        if layer == self.LAYER_HOST:
+            return {'layer': layer, 'ip': id.ip_str(), 'mac': id.mac_str(),
+                    'dpid': "%016x" % id.dpid}
+        return {'layer': layer, 'dpid': "%016x" % id.dpid}
 
 
     def __init__(self, k = 4, speed = 1.0):
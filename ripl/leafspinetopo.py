@@ -11,6 +11,8 @@ standard Mininet Topo object with layer metadata plus convenience functions to
 enumerate up, down, and layer edges.
 '''
 
+from collections import defaultdict
+
 from mininet.topo import Topo
 
 
@@ -20,6 +22,8 @@ PORT_BASE = 1  # starting index for OpenFlow switch ports
 class NodeID(object):
     '''Topo node identifier.'''
 
+    __slots__ = ('dpid',)
+
     def __init__(self, dpid = None):
         '''Init.
 
@@ -55,6 +59,9 @@ class NodeID(object):
 class StructuredNodeSpec(object):
     '''Layer-specific vertex metadata for a StructuredTopo graph.'''
 
+    __slots__ = ('up_total', 'down_total', 'up_speed', 'down_speed',
+                 'type_str')
+
     def __init__(self, up_total, down_total, up_speed, down_speed,
                  type_str = None):
         '''Init.
@@ -75,6 +82,8 @@ class StructuredNodeSpec(object):
 class StructuredEdgeSpec(object):
     '''Static edge metadata for a StructuredTopo graph.'''
 
+    __slots__ = ('speed',)
+
     def __init__(self, speed = 1.0):
         '''Init.
 
@@ -96,6 +105,86 @@ class StructuredTopo(Topo):
         super(StructuredTopo, self).__init__()
         self.node_specs = node_specs
         self.edge_specs = edge_specs
+        self._layer_of = {}  # node name -> layer, filled in by addNode
+        self._nodes_by_layer = defaultdict(set)  # layer -> node names
+        self._up_cache = {}  # node name -> up_nodes result
+        self._down_cache = {}  # node name -> down_nodes result
+        self._adj = {}  # node name -> {neighbor name: link opts}
+        self._n_nodes = None  # cached counts; None until next query
+        self._n_edges = None
+
+    def addNode(self, name, **opts):
+        '''Add node, recording its layer for fast lookup.
+
+        @param name name of node
+        @param opts node options, normally from def_nopts
+        @return name name of node
+        '''
+        # FatTreeTopo adds some switches more than once; bucket them once.
+        if 'layer' in opts and name not in self._layer_of:
+            layer = opts['layer']
+            self._layer_of[name] = layer
+            self._nodes_by_layer[layer].add(name)
+        self._n_nodes = None
+        return super(StructuredTopo, self).addNode(name, **opts)
+
+    def addLink(self, node1, node2, *args, **opts):
+        '''Add link, tracking adjacency and dropping cached neighbors.
+
+        @param node1 name of first node
+        @param node2 name of second node
+        @return result whatever Topo.addLink returns
+        '''
+        adj = self._adj
+        adj.setdefault(node1, {})[node2] = opts
+        adj.setdefault(node2, {})[node1] = opts
+        for cache in (self._up_cache, self._down_cache):
+            cache.pop(node1, None)
+            cache.pop(node2, None)
+        self._n_edges = None
+        return super(StructuredTopo, self).addLink(node1, node2, *args,
+                                                   **opts)
+
+    def _bulk_add_edges(self, edges, **opts):
+        '''Add many links, updating StructuredTopo state once per batch.
+
+        Calls Topo.addLink directly for every edge, so Mininet's port and
+        link bookkeeping is done, but any subclass override of addLink is
+        bypassed.
+
+        @param edges iterable of (node1, node2) name pairs
+        @param opts link options applied to every edge
+        '''
+        adj = self._adj
+        add_link = super(StructuredTopo, self).addLink
+        for node1, node2 in edges:
+            link_opts = dict(opts)
+            adj.setdefault(node1, {})[node2] = link_opts
+            adj.setdefault(node2, {})[node1] = link_opts
+            add_link(node1, node2, **opts)
+        self._up_cache.clear()
+        self._down_cache.clear()
+        self._n_edges = None
+
+    def number_of_nodes(self):
+        '''Return number of nodes, cached until the topo next changes.
+
+        @return count number of nodes
+        '''
+        if self._n_nodes is None:
+            self._n_nodes = len(self.g.nodes())
+        return self._n_nodes
+
+    def number_of_edges(self):
+        '''Return number of links, cached until the topo next changes.
+
+        Counted from Topo.links(), so parallel links count individually.
+
+        @return count number of links
+        '''
+        if self._n_edges is None:
+            self._n_edges = len(self.links(sort = False))
+        return self._n_edges
 
     def def_nopts(self, layer):
         '''Return default dict for a structured topo.
@@ -111,7 +200,7 @@ class StructuredTopo(Topo):
         @param name name of switch
         @return layer layer of switch
         '''
-        return self.node_info[name]['layer']
+        return self._layer_of[name]
 
     def isPortUp(self, port):
         ''' Returns whether port is facing up or down
@@ -127,12 +216,7 @@ class StructuredTopo(Topo):
         @param layer layer
         @return names list of names
         '''
-        def is_layer(n):
-            '''Returns true if node is at layer.'''
-            return self.layer(n) == layer
-
-        nodes = [n for n in self.g.nodes() if is_layer(n)]
-        return nodes
+        return list(self._nodes_by_layer.get(layer, ()))
 
     def up_nodes(self, name):
         '''Return edges one layer higher (closer to core).
@@ -141,9 +225,13 @@ class StructuredTopo(Topo):
 
         @return names list of names
         '''
-        layer = self.layer(name) - 1
-        nodes = [n for n in self.g[name] if self.layer(n) == layer]
-        return nodes
+        nodes = self._up_cache.get(name)
+        if nodes is None:
+            layer = self._layer_of[name] - 1
+            wanted = self._nodes_by_layer.get(layer, frozenset())
+            nodes = tuple(wanted.intersection(self._adj.get(name, ())))
+            self._up_cache[name] = nodes
+        return list(nodes)
 
     def down_nodes(self, name):
         '''Return edges one layer higher (closer to hosts).
@@ -151,9 +239,13 @@ class StructuredTopo(Topo):
         @param name name
         @return names list of names
         '''
-        layer = self.layer(name) + 1
-        nodes = [n for n in self.g[name] if self.layer(n) == layer]
-        return nodes
+        nodes = self._down_cache.get(name)
+        if nodes is None:
+            layer = self._layer_of[name] + 1
+            wanted = self._nodes_by_layer.get(layer, frozenset())
+            nodes = tuple(wanted.intersection(self._adj.get(name, ())))
+            self._down_cache[name] = nodes
+        return list(nodes)
 
     def up_edges(self, name):
         '''Return edges one layer higher (closer to core).
@@ -175,6 +267,27 @@ class StructuredTopo(Topo):
 
 
 
+def _gen_edges(k):
+    '''Plan LeafSpineTopo links as pairs of node indices.
+
+    Nodes are numbered spines first (k), then leaves (2k), then hosts
+    (k // 2 per leaf).  Per node, links come out in the order Mininet should
+    number their ports: each leaf's host links, then all leaf-spine links.
+
+    @param k switch degree
+    @return (src_idx, dst_idx) lists of node indices, one entry per link
+    '''
+    half = k // 2
+    leaf_base = k
+    host_base = leaf_base + k * 2
+    src_idx = [host_base + h for l in range(0, k * 2)
+               for h in range(l * half, (l + 1) * half)]
+    dst_idx = [leaf_base + l for l in range(0, k * 2) for h in range(0, half)]
+    src_idx += [leaf_base + l for l in range(0, k * 2) for s in range(0, k)]
+    dst_idx += [s for l in range(0, k * 2) for s in range(0, k)]
+    return src_idx, dst_idx
+
+
 class LeafSpineTopo(StructuredTopo):
     '''Three-layer homogeneous Fat Tree.
 
@@ -188,7 +301,8 @@ class LeafSpineTopo(StructuredTopo):
     class LeafSpineNodeID(NodeID):
         '''Fat Tree-specific node.'''
 
-  
+        __slots__ = ('sw', 'host', '_name', '_mac', '_ip', '_dpid')
+
         def __init__(self, sw = 0, host = 0, dpid = None, name = None):
             '''Create FatTreeNodeID object from custom params.
 
@@ -201,50 +315,73 @@ class LeafSpineTopo(StructuredTopo):
             @param name optional name
             '''
             if dpid:
-                self.sw = (dpid & 0xff00) >> 8
-                self.host = (dpid & 0xff)
-                self.dpid = dpid
+                sw = (dpid & 0xff00) >> 8
+                host = (dpid & 0xff)
             elif name:
                 sw, host = [int(s) for s in name.split('_')]
-                self.sw = sw
-                self.host = host
-                self.dpid = (sw << 8) + host
+                dpid = (sw << 8) + host
             else:
-                self.sw = sw
-                self.host = host
-                self.dpid = (sw << 8) + host
+                dpid = (sw << 8) + host
+            self.sw = sw
+            self.host = host
+            self.dpid = dpid
+            # Node IDs are immutable; format each string form once.
+            self._name = "%i_%i" % (sw, host)
+            self._mac = "00:00:00:00:%02x:%02x" % (sw, host)
+            self._ip = "10.0.%i.%i" % (sw, host)
+            self._dpid = "%016x" % dpid
 
         def __str__(self):
             return "(%i, %i)" % (self.sw, self.host)
 
         def name_str(self):
             '''Return name string'''
-            return "%i_%i" % (self.sw, self.host)
+            return self._name
 
         def mac_str(self):
             '''Return MAC string'''
-            return "00:00:00:00:%02x:%02x" % (self.sw, self.host)
+            return self._mac
 
         def ip_str(self):
             '''Return IP string'''
-            return "10.0.%i.%i" % (self.sw, self.host)
+            return self._ip
+
+        def dpid_str(self):
+            '''Return zero-padded hex DPID string'''
+            return self._dpid
 
-    def def_nopts(self, layer, name = None):
+    def def_nopts(self, layer, name = None, node_id = None):
         '''Return default dict for a FatTree topo.
 
         @param layer layer of node
         @param name name of node
+        @param node_id optional LeafSpineNodeID; saves re-parsing name
         @return d dict with layer key/val pair, plus anything else (later)
         '''
-        d = {'layer': layer}
-        if name:
-            id = self.id_gen(name = name)
-            # For hosts only, set the IP
-            if layer == self.LAYER_HOST:
-              d.update({'ip': id.ip_str()})
-              d.update({'mac': id.mac_str()})
-            d.update({'dpid': "%016x" % id.dpid})
-        return d
+        if node_id is None:
+            if not name:
+                return {'layer': layer}
+            node_id = self.id_gen(name = name)
+        # For hosts only, set the IP
+        if layer == self.LAYER_HOST:
+            return {'layer': layer, 'ip': node_id.ip_str(),
+                    'mac': node_id.mac_str(), 'dpid': node_id.dpid_str()}
+        return {'layer': layer, 'dpid': node_id.dpid_str()}
+
+    def _add_node(self, layer, node_id):
+        '''Add a spine, leaf or host node from its ID.
+
+        @param layer layer of node
+        @param node_id LeafSpineNodeID of node
+        @return name name of node
+        '''
+        name = node_id.name_str()
+        opts = self.def_nopts(layer, node_id = node_id)
+        if layer == self.LAYER_HOST:
+            self.addHost(name, **opts)
+        else:
+            self.addSwitch(name, **opts)
+        return name
 
 
     def __init__(self, k = 4, speed = 1.0):
@@ -253,8 +390,9 @@ class LeafSpineTopo(StructuredTopo):
         @param k switch degree
         @param speed bandwidth in Gbps
         '''
+        half = k // 2  # hosts per leaf
         spine = StructuredNodeSpec(0, k * 2, None, speed, type_str = 'spine')
-        leaf = StructuredNodeSpec(k, k / 2, speed, speed, type_str = 'leaf')        
+        leaf = StructuredNodeSpec(k, half, speed, speed, type_str = 'leaf')
         host = StructuredNodeSpec(1, 0, speed, None, type_str = 'host')
         
         node_specs = [leaf, spine, host]
@@ -263,32 +401,18 @@ class LeafSpineTopo(StructuredTopo):
 
         self.k = k
         self.id_gen = LeafSpineTopo.LeafSpineNodeID
-        
-        pods = range(0, k)
-        core_sws = range(1, k / 2 + 1)
-        agg_sws = range(k / 2, k)
-        edge_sws = range(0, k / 2)
-        hosts = range(2, k / 2 + 2)
-        
-        spine_sws = range(1, k + 1)
-        leaf_sws = range(1, k*2 + 1)
-        
-        spines = []
-        for s in range(0, k):
-            spine_id = self.id_gen(0, s).name_str()
-            spine_opts = self.def_nopts(self.LAYER_SPINE, spine_id)
-            self.addSwitch(spine_id, **spine_opts)
-            spines.append(spine_id)
-         
-        for l in range(0, k * 2):
-            leaf_id = self.id_gen(1, l).name_str()
-            leaf_opts = self.def_nopts(self.LAYER_LEAF, leaf_id)
-            self.addSwitch(leaf_id, **leaf_opts)
-            for h in range(0, k / 2):
-                host_id = self.id_gen(2, l * (k / 2) + h).name_str()
-                host_opts = self.def_nopts(self.LAYER_HOST, host_id)
-                self.addHost(host_id, **host_opts)
-                self.addLink(host_id, leaf_id)
-            for s in spines:
-                self.addLink(leaf_id, s)
-            
+
+        # Add every node, then every link planned by _gen_edges.  The name
+        # table is ordered spines, leaves, hosts to match its node indices.
+        add_node, id_gen = self._add_node, self.id_gen
+        spines = tuple([add_node(self.LAYER_SPINE, id_gen(0, s))
+                        for s in range(0, k)])
+        leafs = tuple([add_node(self.LAYER_LEAF, id_gen(1, l))
+                       for l in range(0, k * 2)])
+        hosts = tuple([add_node(self.LAYER_HOST, id_gen(2, h))
+                       for h in range(0, k * 2 * half)])
+        names = spines + leafs + hosts
+
+        src_idx, dst_idx = _gen_edges(k)
+        self._bulk_add_edges((names[src], names[dst])
+                             for src, dst in zip(src_idx, dst_idx))